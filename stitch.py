@@ -1,7 +1,11 @@
 import os
-import subprocess
+import sys
+import hashlib
+import argparse
 import tempfile
 import shutil
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import our custom modules
 from utils.ui import (
@@ -9,16 +13,201 @@ from utils.ui import (
     print_warning, print_info, print_final_success
 )
 from utils.youtube import parse_youtube_url
-from utils.video_processor import process_video_clip, check_dependencies
-from utils.video_stitcher import stitch_videos
+from utils.video_processor import extract_clips, download_clip_sources, check_dependencies
+from utils.video_stitcher import stitch_videos, stitch_in_one_pass
 from utils.config import Config, read_input_file, display_processing_info
 
 
+# RAM-backed filesystem used for the working directory when it has room
+TMPFS_DIR = "/dev/shm"
+
+# Generous estimate of disk use per second of clip (downloaded section plus cut clip)
+BYTES_PER_CLIP_SECOND = 3_000_000
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Create a video compilation from timestamped YouTube links.")
+    parser.add_argument('--parallel', type=int, metavar='N',
+                        help="number of videos to download at the same time (overrides parallel_jobs)")
+    return parser.parse_args()
+
+
+def pick_temp_base(clip_count, clip_duration):
+    """
+    Choose where to create the working directory.
+    
+    On Linux the intermediate files go to tmpfs when it has at least twice the
+    space they are expected to need, so they never hit the disk.
+    
+    Returns:
+        str: Base directory, or None for the system default
+    """
+    if not sys.platform.startswith('linux') or not os.path.isdir(TMPFS_DIR):
+        return None
+    try:
+        free = shutil.disk_usage(TMPFS_DIR).free
+    except OSError:
+        return None
+    needed = clip_count * (clip_duration + 2) * BYTES_PER_CLIP_SECOND
+    return TMPFS_DIR if free >= 2 * needed else None
+
+
+def parse_urls(urls):
+    """
+    Parse every input URL once, reporting the ones that cannot be parsed.
+    
+    Returns:
+        dict: clip_num -> (video_id, start_time) for each URL that parsed
+    """
+    parsed = {}
+    for i, url in enumerate(urls, 1):
+        try:
+            parsed[i] = parse_youtube_url(url)
+        except Exception as e:
+            print_error(f"Error processing URL {i}: {str(e)}")
+    return parsed
+
+
+def group_urls_by_video(parsed):
+    """
+    Group parsed URLs by video so each video is fetched once.
+    
+    Returns:
+        dict: video_id -> list of (clip_num, start_time) tuples, in input order
+    """
+    groups = defaultdict(list)
+    for i, (video_id, start_time) in parsed.items():
+        groups[video_id].append((i, start_time))
+    return groups
+
+
+def clip_key(video_id, start_time, clip_num, config):
+    """
+    Name a clip after everything that affects its content.
+    
+    The clip number only matters when it is drawn on the clip.
+    """
+    label = clip_num if config.show_clip_numbers else ""
+    raw = f"{video_id}|{start_time}|{config.clip_duration}|{label}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+
+def process_video(video_id, clips, total, config, temp_dir, encode_pool):
+    """
+    Download the sections for all clips taken from one video and queue their extraction.
+    
+    Extraction runs on encode_pool, so this download worker is free for the
+    next video while the clips are cut and encoded.
+    
+    With work_dir set, finished clips are kept there under a content key and
+    clips left by an earlier run are reused instead of being downloaded again.
+    
+    Returns:
+        Future: Resolves to a dict of clip_num -> (clip path, encoder), for successful clips
+    """
+    work_paths = {
+        i: os.path.join(temp_dir, f"clip_{i:03d}_{video_id}.mp4") for i, _ in clips
+    }
+    if config.work_dir:
+        clip_paths = {
+            i: os.path.join(config.work_dir, f"clip_{clip_key(video_id, start_time, i, config)}.mp4")
+            for i, start_time in clips
+        }
+    else:
+        clip_paths = work_paths
+    
+    done = []
+    pending = []
+    for i, start_time in clips:
+        if config.work_dir and os.path.isfile(clip_paths[i]) and os.path.getsize(clip_paths[i]) > 0:
+            print_info(f"Reusing clip {i} from a previous run")
+            done.append(i)
+        else:
+            pending.append((i, start_time))
+    
+    sources = {}
+    if pending:
+        try:
+            sources = download_clip_sources(video_id, pending, config.clip_duration, temp_dir, total)
+        except Exception as e:
+            print_error(f"Error processing video {video_id}: {str(e)}")
+    
+    return encode_pool.submit(
+        finish_video, video_id, pending, sources, done, work_paths, clip_paths, total, config, temp_dir
+    )
+
+
+def finish_video(video_id, pending, sources, done, work_paths, clip_paths, total, config, temp_dir):
+    """
+    Extract the downloaded clips of one video and collect every clip that is ready.
+    
+    Returns:
+        dict: clip_num -> (clip path, encoder), for successful clips. The encoder
+        is None for clips reused from work_dir, since it was not recorded.
+    """
+    processed = {}
+    if pending:
+        try:
+            processed = extract_clips(
+                video_id, [(i, start_time, work_paths[i]) for i, start_time in pending],
+                sources, config.clip_duration, temp_dir, total
+            )
+        except Exception as e:
+            print_error(f"Error processing video {video_id}: {str(e)}")
+    
+    # Clips only reach work_dir once complete, so an interrupted run never
+    # leaves a partial file that would be reused
+    if config.work_dir:
+        for i in processed:
+            shutil.move(work_paths[i], clip_paths[i])
+    
+    for i, _ in pending:
+        if i not in processed:
+            print_warning(f"Skipped clip {i} due to processing error")
+    clips = {i: (clip_paths[i], None) for i in done}
+    clips.update((i, (clip_paths[i], encoder)) for i, encoder in processed.items())
+    return clips
+
+
+def download_video(video_id, clips, total, config, temp_dir):
+    """
+    Download the source sections for all clips of one video without processing them.
+    
+    Returns:
+        dict: clip_num -> (downloaded source path, None), for successful downloads
+    """
+    sources = download_clip_sources(video_id, clips, config.clip_duration, temp_dir, total)
+    for i, _ in clips:
+        if i not in sources:
+            print_warning(f"Skipped clip {i} due to download error")
+    return {i: (path, None) for i, path in sources.items()}
+
+
+def remove_temp_dir(path):
+    """
+    Delete the working directory.
+    
+    The directory is normally flat, so its files are unlinked in one scandir
+    pass; anything else falls back to shutil.rmtree.
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+    os.rmdir(path)
+
+
 def main():
     """Main function to process YouTube URLs and create video compilation."""
+    args = parse_args()
     
     # Load configuration
     config = Config()
+    if args.parallel:
+        config.parallel_jobs = args.parallel
     
     print_header()
     
@@ -34,70 +223,73 @@ def main():
         return
     
     # Display processing information
-    display_processing_info(config, urls)
+    parsed = parse_urls(urls)
+    display_processing_info(config, urls, parsed)
     
     # Step 3: Process each clip
     print_step(3, 4, f"Processing {len(urls)} video clips")
     
     # Create temporary directory
-    temp_dir = tempfile.mkdtemp(prefix="clip_stitcher_")
+    temp_dir = tempfile.mkdtemp(prefix="clip_stitcher_", dir=pick_temp_base(len(urls), config.clip_duration))
     print_info(f"Working directory: {temp_dir}")
+    if config.work_dir and config.single_pass:
+        # Single-pass mode writes no clip files that could be kept
+        print_warning("work_dir is ignored in single-pass mode")
+    elif config.work_dir:
+        os.makedirs(config.work_dir, exist_ok=True)
+        print_info(f"Keeping finished clips in: {config.work_dir}")
     
     try:
-        clip_paths = []
-        successful_clips = 0
+        # Process videos concurrently; clips from the same video are handled
+        # together so it is only fetched once. Downloads and encodes run in
+        # separate pools so network and CPU/GPU work overlap. Results are
+        # keyed by clip number so the compilation keeps the order of the input
+        # file. In single-pass mode workers only download, and cutting happens
+        # in the final ffmpeg run.
+        groups = group_urls_by_video(parsed)
+        workers = max(1, min(config.parallel_jobs or 4, len(groups)))
+        encode_workers = max(1, min(config.encode_jobs or 2, len(groups)))
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers) as download_pool, \
+                ThreadPoolExecutor(max_workers=encode_workers) as encode_pool:
+            if config.single_pass:
+                futures = [
+                    download_pool.submit(download_video, video_id, clips, len(urls), config, temp_dir)
+                    for video_id, clips in groups.items()
+                ]
+            else:
+                futures = [
+                    download_pool.submit(process_video, video_id, clips, len(urls), config, temp_dir, encode_pool)
+                    for video_id, clips in groups.items()
+                ]
+                # Each download hands back the future of its queued extraction
+                futures = [future.result() for future in as_completed(futures)]
+            for future in as_completed(futures):
+                results.update(future.result())
         
-        # Process each URL
-        for i, url in enumerate(urls, 1):
-            try:
-                # Parse URL
-                video_id, start_time = parse_youtube_url(url)
-                
-                # Process clip
-                clip_filename = f"clip_{i:03d}_{video_id}.mp4"
-                clip_path = os.path.join(temp_dir, clip_filename)
-                
-                if process_video_clip(video_id, start_time, config.clip_duration, clip_path, temp_dir, i, len(urls)):
-                    clip_paths.append(clip_path)
-                    successful_clips += 1
-                else:
-                    print_warning(f"Skipped clip {i} due to processing error")
-                    
-            except Exception as e:
-                print_error(f"Error processing URL {i}: {str(e)}")
-                continue
+        numbered_paths = [(results[i][0], i) for i in sorted(results)]
+        clip_paths = [path for path, _ in numbered_paths]
+        clip_encoders = [results[i][1] for i in sorted(results)]
+        successful_clips = len(clip_paths)
         
         print(f"\n📊 Processing complete: {successful_clips}/{len(urls)} clips successful")
         
         # Step 4: Create final video
         if clip_paths:
             print_step(4, 4, "Creating final video")
-            if stitch_videos(clip_paths, config.output_file, temp_dir, config.use_transitions, config.transition_duration, config.clip_duration):
-                # Get final video info and display success message
-                try:
-                    file_size = os.path.getsize(config.output_file) / (1024 * 1024)  # MB
-                    
-                    # Check video properties
-                    video_info = ""
-                    try:
-                        result = subprocess.run(['ffprobe', '-v', 'quiet', '-select_streams', 'v:0', 
-                                               '-show_entries', 'stream=width,height,r_frame_rate', 
-                                               '-of', 'csv=s=x:p=0', config.output_file], 
-                                               capture_output=True, text=True, check=True)
-                        video_info = result.stdout.strip()
-                    except Exception:
-                        video_info = "Unknown"
-                    
-                    print_final_success(
-                        filename=config.output_file,
-                        file_size=file_size,
-                        clip_count=len(clip_paths),
-                        duration=len(clip_paths) * config.clip_duration,
-                        quality=video_info
-                    )
-                    
-                except Exception:
-                    print_success("Video compilation created successfully!")
+            if config.single_pass:
+                stitched = stitch_in_one_pass(
+                    numbered_paths, config.output_file, temp_dir, config.clip_duration,
+                    config.use_transitions, config.transition_duration, config.show_clip_numbers
+                )
+            else:
+                stitched = stitch_videos(clip_paths, config.output_file, temp_dir, config.use_transitions, config.transition_duration, config.clip_duration, clip_encoders)
+            
+            if stitched is not None:
+                # The stitch step reports the output stream, so no extra ffprobe is needed
+                print_final_success(
+                    config.output_file, len(clip_paths), config.clip_duration, stream_info=stitched
+                )
             else:
                 print_error("Failed to create final video")
         else:
@@ -108,7 +300,7 @@ def main():
         # Cleanup temporary files
         print_info("Cleaning up temporary files...")
         try:
-            shutil.rmtree(temp_dir)
+            remove_temp_dir(temp_dir)
             print_success("Cleanup complete")
         except Exception as e:
             print_warning(f"Could not clean up temporary directory: {str(e)}")
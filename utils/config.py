@@ -3,16 +3,30 @@ Configuration and file handling utilities.
 """
 
 import os
+import json
 import yaml
 from pathlib import Path
 from .ui import print_success, print_error, print_info
-from .youtube import parse_youtube_url
 
 
 class Config:
-    """Configuration class for the YouTube Clip Stitcher."""
+    """
+    Configuration class for the YouTube Clip Stitcher.
+    
+    There is a single instance per process: every Config() call returns it,
+    and config.yaml is only read when it is first created.
+    """
+    
+    _instance = None
     
-    def __init__(self):
+    def __new__(cls):
+        if cls._instance is None:
+            instance = super().__new__(cls)
+            instance._initialize()
+            cls._instance = instance
+        return cls._instance
+    
+    def _initialize(self):
         # Default values (fallback if config.yaml is missing or incomplete)
         self.input_file = "input.txt"
         self.output_file = "final_output.mp4"
@@ -20,6 +34,11 @@ class Config:
         self.use_transitions = True
         self.transition_duration = 1.0
         self.fonts_dir = "assets/fonts"
+        self.parallel_jobs = 4
+        self.encode_jobs = 2
+        self.show_clip_numbers = True
+        self.single_pass = False
+        self.work_dir = None
         
         # Advanced settings with defaults
         self.video_quality = "1080p"
@@ -36,14 +55,10 @@ class Config:
             config_path = Path(__file__).parent.parent / "config.yaml"
             
             if not config_path.exists():
-                # Only show this message once by checking if it's the first Config instance
-                if not hasattr(Config, '_yaml_message_shown'):
-                    print_info("No config.yaml found, using default settings")
-                    Config._yaml_message_shown = True
+                print_info("No config.yaml found, using default settings")
                 return
             
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config_data = yaml.safe_load(f)
+            config_data = self._read_config_data(config_path)
             
             if not config_data:
                 return
@@ -53,10 +68,7 @@ class Config:
                 if hasattr(self, key):
                     setattr(self, key, value)
             
-            # Only show this message once
-            if not hasattr(Config, '_yaml_message_shown'):
-                print_info("Configuration loaded from config.yaml")
-                Config._yaml_message_shown = True
+            print_info("Configuration loaded from config.yaml")
             
         except yaml.YAMLError as e:
             print_error(f"Error parsing config.yaml: {e}")
@@ -64,6 +76,35 @@ class Config:
         except Exception as e:
             print_error(f"Error loading config.yaml: {e}")
             print_info("Using default settings")
+    
+    @staticmethod
+    def _read_config_data(config_path):
+        """
+        Parse config.yaml, reusing a JSON copy of the result while the file is unchanged.
+        
+        The cache sits next to config.yaml with the YAML file's mtime on its
+        first line; loading JSON is much cheaper than running the YAML parser.
+        """
+        mtime = config_path.stat().st_mtime_ns
+        cache_path = config_path.with_name(config_path.name + ".cache.json")
+        header = f"# mtime: {mtime}\n"
+        
+        try:
+            cached = cache_path.read_text(encoding='utf-8')
+            if cached.startswith(header):
+                return json.loads(cached[len(header):])
+        except (OSError, ValueError):
+            pass
+        
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config_data = yaml.safe_load(f)
+        
+        try:
+            cache_path.write_text(header + json.dumps(config_data), encoding='utf-8')
+        except (OSError, TypeError):
+            pass  # Caching is best effort
+        
+        return config_data
 
 
 def read_input_file(config):
@@ -83,8 +124,9 @@ def read_input_file(config):
     
     urls = []
     try:
-        with open(config.input_file, 'r') as f:
-            urls = [line.strip() for line in f if line.strip()]
+        # Read the file in one go and strip each line exactly once
+        text = Path(config.input_file).read_text(encoding='utf-8')
+        urls = list(filter(None, map(str.strip, text.splitlines())))
     except Exception as e:
         print_error(f"Error reading input file: {str(e)}")
         return None
@@ -98,8 +140,8 @@ def read_input_file(config):
     return urls
 
 
-def display_processing_info(config, urls):
-    """Display information about the processing configuration and URLs."""
+def display_processing_info(config, urls, parsed):
+    """Display information about the processing configuration and the parsed URLs."""
     # Display transition settings
     if config.use_transitions and len(urls) > 1:
         print_info(f"Blend transitions enabled ({config.transition_duration}s duration)")
@@ -111,10 +153,10 @@ def display_processing_info(config, urls):
     # Display the URLs to be processed
     print("\n📋 URLs to process:")
     for i, url in enumerate(urls, 1):
-        try:
-            video_id, start_time = parse_youtube_url(url)
+        if i in parsed:
+            video_id, start_time = parsed[i]
             print(f"   {i}. Video: {video_id} (starting at {start_time}s)")
-        except Exception:
+        else:
             print(f"   {i}. {url} (⚠️  may have parsing issues)")
     
     print()
@@ -0,0 +1,206 @@
+"""
+Caching for ffprobe results and dependency checks.
+Probing a file always gives the same answer, so results are stored on disk
+and reused across runs instead of spawning ffprobe again.
+"""
+
+import os
+import json
+import shutil
+import threading
+import functools
+import subprocess
+from pathlib import Path
+
+CACHE_FILE = Path.home() / ".cache" / "clip-stitcher" / "probe.json"
+
+# Entries kept on disk; the oldest are dropped first
+MAX_CACHE_ENTRIES = 500
+
+_lock = threading.Lock()
+_entries = None
+
+# Tool name -> (resolved path, mtime) of binaries that passed a version check
+_checked_tools = {}
+
+
+def _load_entries():
+    """Load the on-disk probe cache (once per process)."""
+    global _entries
+    if _entries is None:
+        try:
+            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                _entries = json.load(f)
+        except (OSError, ValueError):
+            _entries = {}
+    return _entries
+
+
+def _save_entries():
+    """Write the probe cache back to disk, replacing the old file atomically."""
+    # Entries are kept in insertion order, so the first ones are the oldest
+    for key in list(_entries)[:-MAX_CACHE_ENTRIES]:
+        del _entries[key]
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = CACHE_FILE.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_entries, f)
+        os.replace(tmp_path, CACHE_FILE)
+    except OSError:
+        pass  # Caching is best effort
+
+
+def _probe(path):
+    """Run ffprobe on a file and return its video stream properties."""
+    probe_cmd = [
+        'ffprobe', '-v', 'quiet', '-select_streams', 'v:0',
+        '-show_entries', 'stream=codec_name,width,height,r_frame_rate:format=duration',
+        '-of', 'json', path
+    ]
+    result = subprocess.run(probe_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            text=True, check=True)
+    data = json.loads(result.stdout)
+    stream = data['streams'][0]
+    return {
+        'codec': stream.get('codec_name'),
+        'width': stream.get('width'),
+        'height': stream.get('height'),
+        'fps': stream.get('r_frame_rate'),
+        'duration': float(data.get('format', {}).get('duration', 0)),
+    }
+
+
+def get_source_info(path, video_id, start_time, clip_duration):
+    """
+    Get the video properties of a downloaded section, probing it only on a cache miss.
+
+    Args:
+        path (str): Path to the video file
+        video_id (str): YouTube video ID the file was downloaded from
+        start_time (int): Start of the section in the video, in seconds
+        clip_duration (int): Duration of the clip the section was downloaded for
+
+    Returns:
+        dict: codec, width, height, fps (as a rate string) and duration, or None if probing failed
+    """
+    try:
+        key = f"{video_id}:{start_time}+{clip_duration}:{os.path.getsize(path)}"
+    except OSError:
+        return None
+
+    with _lock:
+        cached = _load_entries().get(key)
+    if cached:
+        return cached
+
+    try:
+        info = _probe(path)
+    except Exception:
+        return None
+
+    with _lock:
+        _entries[key] = info
+        _save_entries()
+    return info
+
+
+def is_tool_available(name, version_args):
+    """
+    Check that a command line tool runs, skipping the check if the binary is unchanged.
+
+    Args:
+        name (str): Executable name
+        version_args (list): Arguments that make the tool print its version
+
+    Returns:
+        bool: True if the tool is available
+    """
+    path = shutil.which(name)
+    if not path:
+        return False
+
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return False
+
+    if _checked_tools.get(name) == (path, mtime):
+        return True
+
+    try:
+        subprocess.run([path] + version_args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    except (subprocess.CalledProcessError, OSError):
+        return False
+
+    _checked_tools[name] = (path, mtime)
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def has_audio_stream(path):
+    """
+    Check whether a file has an audio stream (probed once per path per process).
+
+    Args:
+        path (str): Path to the video file
+
+    Returns:
+        bool: True if the file has at least one audio stream
+    """
+    probe_cmd = [
+        'ffprobe', '-v', 'quiet', '-select_streams', 'a',
+        '-show_entries', 'stream=index', '-of', 'csv=p=0', path
+    ]
+    try:
+        result = subprocess.run(probe_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            text=True, check=True)
+    except (subprocess.CalledProcessError, OSError):
+        # Assume audio so a failed probe keeps the previous behaviour
+        return True
+    return bool(result.stdout.strip())
+
+
+@functools.lru_cache(maxsize=None)
+def get_duration(path):
+    """
+    Get the duration of a media file (probed once per path per process).
+    
+    Args:
+        path (str): Path to the video file
+        
+    Returns:
+        float: Duration in seconds, or None if probing failed
+    """
+    probe_cmd = [
+        'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration', '-of', 'csv=p=0', path
+    ]
+    try:
+        result = subprocess.run(probe_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                text=True, check=True)
+        return float(result.stdout.strip())
+    except (subprocess.CalledProcessError, OSError, ValueError):
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def get_ffmpeg_encoders():
+    """
+    List the encoders compiled into ffmpeg (probed once per process).
+
+    Returns:
+        frozenset: Encoder names such as 'libx264' or 'h264_nvenc'
+    """
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True)
+    except (subprocess.CalledProcessError, OSError):
+        return frozenset()
+
+    # Encoder lines look like " V....D libx264   libx264 H.264 / AVC ..."
+    encoders = set()
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] in 'VAS':
+            encoders.add(parts[1])
+    return frozenset(encoders)
@@ -3,62 +3,100 @@ UI utilities for YouTube Clip Stitcher.
 Provides beautiful terminal output with emojis and consistent formatting.
 """
 
+import re
+import sys
+import threading
+
+# Clips are processed on worker threads, so every write goes through this lock
+# to keep lines from different clips from interleaving.
+_print_lock = threading.Lock()
+
+def _emit(message):
+    """Print a message while holding the output lock."""
+    _emit_lines([message])
+
+def _emit_lines(lines):
+    """Write several lines with a single write and flush."""
+    with _print_lock:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+# Video stream line in ffmpeg's log, e.g.
+# "Stream #0:0: Video: h264 (avc1 / 0x31637661), yuv420p, 1920x1080 [SAR 1:1 DAR 16:9], 30 fps, ..."
+_VIDEO_STREAM_RE = re.compile(r"Stream #0:\d+.*?: Video: .*?(\d{2,5}x\d{2,5}).*?([\d.]+) fps")
+
+def parse_stream_info(ffmpeg_log):
+    """
+    Extract the output video's resolution and frame rate from an ffmpeg log.
+    
+    Args:
+        ffmpeg_log (str or bytes): stderr of an ffmpeg run
+        
+    Returns:
+        str: e.g. "1920x1080 @ 30 fps", or None if it could not be found
+    """
+    if isinstance(ffmpeg_log, bytes):
+        ffmpeg_log = ffmpeg_log.decode('utf-8', errors='replace')
+    _, found, output_section = ffmpeg_log.partition("Output #0")
+    match = _VIDEO_STREAM_RE.search(output_section) if found else None
+    return f"{match[1]} @ {match[2]} fps" if match else None
+
 def print_header():
     """Print a nice header for the application."""
-    print("\n" + "="*60)
-    print("           🎬 YOUTUBE CLIP STITCHER 🎬")
-    print("="*60)
-    print("   Create video compilations from YouTube timestamps")
-    print("="*60 + "\n")
+    _emit_lines([
+        "\n" + "="*60,
+        "           🎬 YOUTUBE CLIP STITCHER 🎬",
+        "="*60,
+        "   Create video compilations from YouTube timestamps",
+        "="*60 + "\n",
+    ])
 
 def print_step(step_num, total_steps, message):
     """Print a formatted step message."""
-    print(f"[{step_num}/{total_steps}] {message}")
+    _emit(f"[{step_num}/{total_steps}] {message}")
+
+def print_plain(message):
+    """Print a message without any prefix."""
+    _emit(message)
 
 def print_success(message):
     """Print a success message."""
-    print(f"✅ {message}")
+    _emit(f"✅ {message}")
 
 def print_error(message):
     """Print an error message."""
-    print(f"❌ {message}")
+    _emit(f"❌ {message}")
 
 def print_warning(message):
     """Print a warning message."""
-    print(f"⚠️  {message}")
+    _emit(f"⚠️  {message}")
 
 def print_info(message):
     """Print an info message."""
-    print(f"ℹ️  {message}")
+    _emit(f"ℹ️  {message}")
 
-def print_final_success(output_file, clip_count, clip_duration):
-    """Print the final success summary."""
+def print_final_success(output_file, clip_count, clip_duration, stream_info=None):
+    """Print the final success summary (stream_info comes from parse_stream_info)."""
     try:
         import os
         file_size = os.path.getsize(output_file) / (1024 * 1024)  # MB
         
-        print("\n" + "="*60)
-        print("🎉 SUCCESS! Your video compilation is ready!")
-        print("="*60)
-        print(f"📁 File: {output_file}")
-        print(f"📏 Size: {file_size:.1f} MB")
-        print(f"🎬 Clips: {clip_count} clips")
-        print(f"⏱️  Duration: ~{clip_count * clip_duration} seconds")
-        print("="*60)
+        lines = [
+            "\n" + "="*60,
+            "🎉 SUCCESS! Your video compilation is ready!",
+            "="*60,
+            f"📁 File: {output_file}",
+            f"📏 Size: {file_size:.1f} MB",
+            f"🎬 Clips: {clip_count} clips",
+            f"⏱️  Duration: ~{clip_count * clip_duration} seconds",
+            "="*60,
+        ]
         
-        # Check video properties
-        try:
-            import subprocess
-            result = subprocess.run(['ffprobe', '-v', 'quiet', '-select_streams', 'v:0', 
-                                   '-show_entries', 'stream=width,height,r_frame_rate', 
-                                   '-of', 'csv=s=x:p=0', output_file], 
-                                   capture_output=True, text=True, check=True)
-            info = result.stdout.strip()
-            print(f"🎥 Quality: {info}")
-        except Exception:
-            pass
+        if stream_info:
+            lines.append(f"🎥 Quality: {stream_info}")
         
-        print("\n✨ Enjoy your video compilation! ✨\n")
+        lines.append("\n✨ Enjoy your video compilation! ✨\n")
+        _emit_lines(lines)
         
     except Exception:
         print_success("Video compilation created successfully!")
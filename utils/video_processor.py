@@ -3,17 +3,137 @@ Video processing utilities for the YouTube Clip Stitcher.
 Handles video downloading, extraction, and processing.
 """
 
+import io
 import os
-import shutil
+import time
+import functools
+import random
+import threading
 import subprocess
 from pathlib import Path
-from .ui import print_success, print_error, print_warning, print_info
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .ui import print_success, print_error, print_warning, print_info, print_plain
 from .config import Config
+from .youtube import YoutubeDL, download_sections
+from .probe_cache import get_source_info, is_tool_available, get_ffmpeg_encoders
 
+# Every clip is normalized to this format so the final concat can copy streams
+TARGET_CODEC = "h264"
+TARGET_WIDTH = 1920
+TARGET_HEIGHT = 1080
+TARGET_FPS = "30/1"
 
+# Reported for clips cut with stream copy, in place of an encoder name
+STREAM_COPY = "copy"
+
+# Normalization chain shared by all re-encoding paths. fps comes first so
+# frames dropped from high frame rate sources are never scaled or padded.
+FPS_FILTER = "fps=30"
+SCALE_PAD_FILTER = (
+    "scale=1920:1080:force_original_aspect_ratio=decrease,"
+    "pad=1920:1080:(ow-iw)/2:(oh-ih)/2,setsar=1"
+)
+BASE_VIDEO_FILTER = f"{FPS_FILTER},{SCALE_PAD_FILTER}"
+
+# GPU version of the scale/pad step for frames decoded into CUDA memory.
+# There is no pad_cuda in common ffmpeg builds, so frames are downloaded
+# to system memory after scaling, which is the expensive part.
+CUDA_SCALE_PAD_FILTER = (
+    "scale_cuda=1920:1080:force_original_aspect_ratio=decrease,"
+    "hwdownload,format=nv12,"
+    "pad=1920:1080:(ow-iw)/2:(oh-ih)/2,setsar=1"
+)
+
+# Fastest NVENC mode for the per-clip normalizing encode. -delay 0 and
+# -zerolatency stop NVENC from buffering surfaces before emitting frames.
+NVENC_ARGS = [
+    '-c:v', 'h264_nvenc', '-preset', 'p1', '-tune', 'ull',
+    '-rc', 'cbr', '-b:v', '8M', '-delay', '0', '-zerolatency', '1',
+    '-bf', '0', '-g', '60'
+]
+
+# Seconds downloaded past the end of each clip, so the clip is never cut short by the section
+SECTION_END_MARGIN = 2
+
+# Download attempts per video, and errors that retrying cannot fix
+DOWNLOAD_ATTEMPTS = 3
+UNRECOVERABLE_DOWNLOAD_ERRORS = ("Video unavailable", "Private video", "HTTP Error 404")
+
+# Lines of ffmpeg's log kept for error reports and stream info: the head holds
+# the input/output stream summary, the tail the final messages and any error
+FFMPEG_LOG_HEAD_LINES = 200
+FFMPEG_LOG_TAIL_LINES = 200
+
+# ffmpeg errors meaning the build has NVENC but this machine cannot use it.
+# Any other failure only sends that one encode to the CPU: a 10-bit source the
+# nv12 download cannot take, or "OpenEncodeSessionEx failed" when the driver's
+# session limit is reached, which clears once other encodes finish.
+NVENC_UNAVAILABLE_ERRORS = (
+    "Cannot load libcuda", "Cannot load libnvidia-encode", "No NVENC capable devices found",
+    "CUDA_ERROR_NO_DEVICE", "Device creation failed"
+)
+
+# Set once NVENC turns out to be unusable, so the remaining clips go straight to libx264
+_nvenc_failed = False
+
+
+def run_ffmpeg(cmd, input=None):
+    """
+    Run an ffmpeg command, keeping only the head and tail of its log.
+    
+    The log is drained on a background thread, so a long encode never
+    buffers its whole output in memory. Progress stats are turned off with
+    -nostats, since nothing shows them.
+    
+    Args:
+        cmd (list): Command and arguments
+        input (bytes): Data written to the process's stdin
+        
+    Returns:
+        subprocess.CompletedProcess: With stderr set to the kept part of the log
+        
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg exits with an error
+    """
+    head = []
+    tail = deque(maxlen=FFMPEG_LOG_TAIL_LINES)
+    
+    def drain(stream):
+        # Universal newlines also split on the \r that ends ffmpeg's status lines
+        for line in io.TextIOWrapper(stream, encoding='utf-8', errors='replace', newline=None):
+            if len(head) < FFMPEG_LOG_HEAD_LINES:
+                head.append(line)
+            else:
+                tail.append(line)
+    
+    cmd = [cmd[0], '-nostats', *cmd[1:]]
+    process = subprocess.Popen(
+        cmd, stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    reader = threading.Thread(target=drain, args=(process.stderr,), daemon=True)
+    reader.start()
+    if input is not None:
+        try:
+            process.stdin.write(input)
+            process.stdin.close()
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its return code reports why
+    returncode = process.wait()
+    reader.join()
+    process.stderr.close()
+    
+    log = "".join(head + list(tail))
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=log)
+    return subprocess.CompletedProcess(cmd, returncode, stderr=log)
+
+
+@functools.lru_cache(maxsize=1)
 def find_font_file():
     """
-    Find a font file in the assets/fonts directory.
+    Find a font file in the assets/fonts directory (searched once per process).
     
     Returns:
         str: Path to font file, or None if not found
@@ -48,36 +168,36 @@ def find_font_file():
         return None
 
 
-def prepare_font_for_overlay(font_path, temp_dir):
+def escape_font_path(font_path):
     """
-    Copy font to temp directory for reliable path handling.
+    Escape a font path for use as drawtext's fontfile option.
+    
+    Forward slashes work on every platform, and the drive colon on Windows
+    must be escaped so it is not read as an option separator.
     
     Args:
-        font_path (str): Path to original font file
-        temp_dir (str): Temporary directory for processing
+        font_path (str): Absolute path to the font file
         
     Returns:
-        str: Simple font filename for use in temp directory
+        str: Path that can be placed inside single quotes in a filter graph
     """
-    font_name = os.path.basename(font_path)
-    temp_font_path = os.path.join(temp_dir, font_name)
-    shutil.copy2(font_path, temp_font_path)
-    return font_name
+    return font_path.replace('\\', '/').replace(':', '\\:')
 
 
-def create_drawtext_filter(font_filename, clip_num):
+def create_drawtext_filter(font_file, clip_num):
     """
     Create FFmpeg drawtext filter for clip number overlay.
     
     Args:
-        font_filename (str): Font filename (simple name, no path)
+        font_file (str): Font path as returned by escape_font_path
         clip_num (int): Clip number to display
         
     Returns:
         str: FFmpeg drawtext filter string
     """
     options = [
-        f"fontfile={font_filename}",
+        # Quoting keeps the escaped colon intact through filter graph parsing
+        f"fontfile='{font_file}'",
         f"text={clip_num}",
         "x=24",
         "y=24", 
@@ -90,75 +210,304 @@ def create_drawtext_filter(font_filename, clip_num):
     return "drawtext=" + ":".join(options)
 
 
-def process_video_with_overlay(full_video_path, start_time, clip_duration, clip_path, temp_dir, clip_num):
+def process_video_with_overlay(full_video_path, start_time, clip_duration, clip_path, temp_dir, clip_num,
+                               source_info=None):
     """
     Process video with clip number overlay.
     
     Returns:
-        bool: True if successful, False if overlay failed
+        str: Encoder that produced the clip, or None if overlay failed
     """
-    # Base video processing filters
-    base_vf = (
-        "scale=1920:1080:force_original_aspect_ratio=decrease,"
-        "pad=1920:1080:(ow-iw)/2:(oh-ih)/2,setsar=1,fps=30"
-    )
-    
     # Find and prepare font
     font_path = find_font_file()
     if not font_path:
-        return False
+        return None
     
-    font_filename = prepare_font_for_overlay(font_path, temp_dir)
-    drawtext = create_drawtext_filter(font_filename, clip_num)
+    drawtext = create_drawtext_filter(escape_font_path(font_path), clip_num)
     
     # Create complete filter chain
-    vf_chain = f"{base_vf},{drawtext}"
+    normalize = normalize_filter(source_info)
+    vf_chain = f"{normalize},{drawtext}" if normalize else drawtext
+    
+    try:
+        return _run_encode(full_video_path, start_time, clip_duration, vf_chain, clip_path, temp_dir)
+    except subprocess.CalledProcessError:
+        return None
+
+
+def copy_video_clip(full_video_path, start_time, clip_duration, clip_path, temp_dir):
+    """
+    Cut a clip with stream copy, without re-encoding.
     
-    # Build FFmpeg command
+    Seeking before -i lets the demuxer jump straight to the nearest keyframe.
+    """
     cmd = [
-        'ffmpeg', '-i', full_video_path,
-        '-ss', str(start_time), '-t', str(clip_duration),
-        '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '23',
-        '-vf', vf_chain,
-        '-c:a', 'copy', '-avoid_negative_ts', 'make_zero',
-        '-threads', '0', clip_path, '-y'
+        'ffmpeg', '-ss', str(start_time), '-i', full_video_path,
+        '-t', str(clip_duration), '-c', 'copy',
+        '-avoid_negative_ts', 'make_zero', clip_path, '-y'
     ]
     
-    try:
-        subprocess.run(cmd, capture_output=True, text=True, check=True, cwd=temp_dir)
-        return True
-    except subprocess.CalledProcessError:
-        return False
+    run_ffmpeg(cmd)
+
+
+def copy_video_clips(jobs, temp_dir):
+    """
+    Stream copy several clips with a single ffmpeg run.
+    
+    Each job's section becomes one input and one output, so the process
+    start-up cost is paid once for the whole batch.
+    
+    Args:
+        jobs (list): (full_video_path, start_time, clip_duration, clip_path) tuples
+        temp_dir (str): Temporary directory for processing
+    """
+    cmd = ['ffmpeg']
+    for full_video_path, start_time, _, _ in jobs:
+        cmd.extend(['-ss', str(start_time), '-i', full_video_path])
+    for index, (_, _, clip_duration, clip_path) in enumerate(jobs):
+        cmd.extend([
+            '-map', str(index), '-t', str(clip_duration), '-c', 'copy',
+            '-avoid_negative_ts', 'make_zero', clip_path, '-y'
+        ])
+    
+    run_ffmpeg(cmd)
 
 
-def process_video_without_overlay(full_video_path, start_time, clip_duration, clip_path, temp_dir):
+def process_video_without_overlay(full_video_path, start_time, clip_duration, clip_path, temp_dir, source_info=None):
     """
     Process video without overlay (fallback when overlay fails).
+    
+    Sources whose probed info already matches the target format are stream copied.
+    
+    Returns:
+        str: Encoder that produced the clip, or STREAM_COPY
     """
-    base_vf = (
-        "scale=1920:1080:force_original_aspect_ratio=decrease,"
-        "pad=1920:1080:(ow-iw)/2:(oh-ih)/2,setsar=1,fps=30"
-    )
+    if _matches_target(source_info):
+        copy_video_clip(full_video_path, start_time, clip_duration, clip_path, temp_dir)
+        return STREAM_COPY
     
-    cmd = [
-        'ffmpeg', '-i', full_video_path,
-        '-ss', str(start_time), '-t', str(clip_duration),
-        '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '23',
-        '-vf', base_vf,
-        '-c:a', 'copy', '-avoid_negative_ts', 'make_zero',
-        '-threads', '0', clip_path, '-y'
-    ]
+    return _run_encode(full_video_path, start_time, clip_duration, normalize_filter(source_info), clip_path, temp_dir)
+
+
+def normalize_filter(info):
+    """
+    Build the filter chain that brings a source to the target format.
+    
+    Steps the probed source does not need are left out, so a 1920x1080 source
+    is not rescaled and a 30 fps source is not resampled.
+    
+    Args:
+        info (dict): Probed source info, or None if unknown
+        
+    Returns:
+        str: Filter chain, or None if no filtering is needed
+    """
+    if not info:
+        return BASE_VIDEO_FILTER
+    
+    filters = []
+    if info.get('fps') != TARGET_FPS:
+        filters.append(FPS_FILTER)
+    if (info.get('width'), info.get('height')) != (TARGET_WIDTH, TARGET_HEIGHT):
+        filters.append(SCALE_PAD_FILTER)
+    return ",".join(filters) or None
+
+
+def nvenc_available():
+    """Check whether NVENC should be tried: ffmpeg has it and it has not proved unusable in this run."""
+    return not _nvenc_failed and 'h264_nvenc' in get_ffmpeg_encoders()
+
+
+def handle_nvenc_failure(error):
+    """
+    React to a failed NVENC run before the caller retries it with libx264.
+    
+    NVENC is disabled for the rest of the run only when the log shows the GPU
+    encoder cannot be used at all.
+    
+    Args:
+        error (subprocess.CalledProcessError): The failed ffmpeg run
+    """
+    global _nvenc_failed
+    if not any(message in (error.stderr or "") for message in NVENC_UNAVAILABLE_ERRORS):
+        print_plain("   Hardware encode failed, retrying with software encoding...")
+    elif not _nvenc_failed:
+        _nvenc_failed = True
+        print_info("🔄 Hardware encoding not available, using software encoding...")
+
+
+def _build_decode_args(use_nvenc):
+    """
+    Input options that pair the decoder with the encoder.
+    
+    NVENC gets NVDEC decoding into CUDA frames, so frames do not make a trip
+    through system memory between decoder and encoder. The software encoder
+    gets plain CPU decoding.
+    """
+    if use_nvenc:
+        return ['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda']
+    return []
+
+
+def _cuda_filter(vf_chain):
+    """
+    Adapt a filter chain for frames decoded into CUDA memory.
+    
+    Scaling moves to scale_cuda, and frames are downloaded to system memory
+    only for filters that need them (pad, drawtext). The fps filter is dropped
+    in favour of constant frame rate output options, so frame rate conversion
+    happens when frames are handed to the encoder instead of in the filter graph.
+    Without any remaining filter the frames go from NVDEC to NVENC without
+    leaving the GPU.
     
-    subprocess.run(cmd, capture_output=True, text=True, check=True, cwd=temp_dir)
+    Returns:
+        tuple: (filter chain or None, extra output options)
+    """
+    if not vf_chain:
+        return None, []
+    
+    filters = vf_chain.split(",")
+    rate_args = []
+    if filters[0] == FPS_FILTER:
+        filters = filters[1:]
+        rate_args = ['-r', '30', '-vsync', 'cfr']
+    
+    gpu_chain = ",".join(filters).replace(SCALE_PAD_FILTER, CUDA_SCALE_PAD_FILTER)
+    if "drawtext=" in gpu_chain and "hwdownload" not in gpu_chain:
+        gpu_chain = gpu_chain.replace("drawtext=", "hwdownload,format=nv12,drawtext=", 1)
+    return gpu_chain or None, rate_args
+
+
+def _run_encode(full_video_path, start_time, clip_duration, vf_chain, clip_path, temp_dir):
+    """
+    Re-encode a clip, applying vf_chain if one is given.
+    
+    Uses CUDA decoding, filtering and NVENC when ffmpeg has NVENC, and falls
+    back to the CPU pipeline with libx264 if the hardware encode fails.
+    
+    Returns:
+        str: Name of the encoder that produced the clip
+        
+    Raises:
+        subprocess.CalledProcessError: If the software encode fails
+    """
+    config = Config()
+    
+    # Clips from different videos are encoded at the same time, so split the
+    # cores between the encode workers rather than letting every ffmpeg use all of them
+    threads = max(1, (os.cpu_count() or 1) // max(1, config.encode_jobs))
+    
+    # Input seeking jumps to the keyframe before start_time; when transcoding
+    # ffmpeg decodes from there and drops the rest, so the cut stays frame accurate
+    def build_cmd(decode_args, encoder_args, filters):
+        return [
+            'ffmpeg', *decode_args, '-ss', str(start_time), '-i', full_video_path,
+            '-t', str(clip_duration),
+            *encoder_args,
+            *(['-vf', filters] if filters else []),
+            '-c:a', 'copy', '-avoid_negative_ts', 'make_zero',
+            '-threads', str(threads), clip_path, '-y'
+        ]
+    
+    if nvenc_available():
+        try:
+            gpu_chain, rate_args = _cuda_filter(vf_chain)
+            run_ffmpeg(build_cmd(_build_decode_args(True), NVENC_ARGS + rate_args, gpu_chain))
+            return 'h264_nvenc'
+        except subprocess.CalledProcessError as e:
+            handle_nvenc_failure(e)
+    
+    software_args = ['-c:v', 'libx264', '-preset', config.encoding_preset, '-crf', str(config.crf_value)]
+    run_ffmpeg(build_cmd(_build_decode_args(False), software_args, vf_chain))
+    return 'libx264'
+
+
+def extract_clips(video_id, clips, sources, clip_duration, temp_dir, total_clips):
+    """
+    Extract every clip of one video from its downloaded sections, then delete the sections.
+    
+    Args:
+        video_id (str): YouTube video ID
+        clips (list): (clip_num, start_time, clip_path) tuples for this video
+        sources (dict): Clip number -> downloaded section path, from download_clip_sources
+        clip_duration (int): Duration of each clip in seconds
+        temp_dir (str): Temporary directory for processing
+        total_clips (int): Total number of clips
+        
+    Returns:
+        dict: Clip number -> encoder that produced it (or STREAM_COPY), for successful clips
+    """
+    processed = {}
+    try:
+        if not Config().show_clip_numbers:
+            clips = _copy_matching_clips(video_id, clips, sources, clip_duration, temp_dir, total_clips, processed)
+        
+        for clip_num, start_time, clip_path in clips:
+            full_video_path = sources.get(clip_num)
+            if not full_video_path:
+                continue
+            encoder = extract_clip(video_id, full_video_path, start_time, clip_duration,
+                                   clip_path, temp_dir, clip_num, total_clips)
+            if encoder:
+                processed[clip_num] = encoder
+    finally:
+        # Cleanup (clips with the same start time share a section)
+        for full_video_path in set(sources.values()):
+            if os.path.exists(full_video_path):
+                os.remove(full_video_path)
+    
+    return processed
+
+
+def _copy_matching_clips(video_id, clips, sources, clip_duration, temp_dir, total_clips, processed):
+    """
+    Stream copy every clip whose source already matches the target format in one batch.
+    
+    Successful clips are added to processed as copied.
+    
+    Returns:
+        list: The clips that still need to be extracted one by one
+    """
+    batch = []
+    remaining = []
+    for clip in clips:
+        clip_num, start_time, _ = clip
+        full_video_path = sources.get(clip_num)
+        info = get_source_info(full_video_path, video_id, start_time, clip_duration) if full_video_path else None
+        if _matches_target(info):
+            batch.append((clip, section_lead_in(info['duration'], clip_duration)))
+        else:
+            remaining.append(clip)
+    
+    # A single clip gains nothing from batching
+    if len(batch) < 2:
+        return clips
+    
+    print_plain(f"✂️  Copying {len(batch)} clips from {video_id} in one pass...")
+    # Stream copy still starts on a keyframe, so a copied clip can begin up to
+    # one keyframe interval before its timestamp
+    jobs = [(sources[clip_num], lead_in, clip_duration, clip_path)
+            for (clip_num, _, clip_path), lead_in in batch]
+    try:
+        copy_video_clips(jobs, temp_dir)
+    except subprocess.CalledProcessError:
+        print_warning("Batch copy failed, extracting clips one by one...")
+        return clips
+    
+    for (clip_num, _, _), _ in batch:
+        processed[clip_num] = STREAM_COPY
+        print_success(f"Clip {clip_num}/{total_clips} saved successfully!")
+    return remaining
 
 
-def process_video_clip(video_id, start_time, clip_duration, clip_path, temp_dir, clip_num, total_clips):
+def extract_clip(video_id, full_video_path, start_time, clip_duration, clip_path, temp_dir, clip_num, total_clips):
     """
-    Process a single video clip: download, extract, and prepare for stitching.
+    Extract and normalize one clip from its downloaded section.
     
     Args:
         video_id (str): YouTube video ID
-        start_time (int): Start timestamp in seconds
+        full_video_path (str): Downloaded section of the source video
+        start_time (int): Start timestamp in the original video, in seconds
         clip_duration (int): Duration of clip in seconds
         clip_path (str): Output path for the processed clip
         temp_dir (str): Temporary directory for processing
@@ -166,127 +515,158 @@ def process_video_clip(video_id, start_time, clip_duration, clip_path, temp_dir,
         total_clips (int): Total number of clips
         
     Returns:
-        bool: True if successful, False otherwise
+        str: Encoder that produced the clip (or STREAM_COPY), or None on failure
     """
     try:
-        # Download video
-        if not _download_video(video_id, temp_dir, clip_num, total_clips):
-            return False
-        
-        # Find downloaded file
-        full_video_path = _find_downloaded_file(video_id, temp_dir)
-        if not full_video_path:
-            return False
-        
         # Show source info
-        _show_source_info(full_video_path)
+        source_info = get_source_info(full_video_path, video_id, start_time, clip_duration)
+        _show_source_info(source_info)
         
         # Process video
-        print(f"✂️  Extracting {clip_duration}s clip from {start_time}s...")
-        print("   Processing video...")
+        print_plain(f"✂️  Extracting {clip_duration}s clip {clip_num} from {start_time}s...")
+        print_plain("   Processing video...")
         
-        # Try with overlay first, fallback to no overlay if it fails
-        success = process_video_with_overlay(
-            full_video_path, start_time, clip_duration, clip_path, temp_dir, clip_num
-        )
+        # The section starts on the keyframe before the timestamp
+        section_start = section_lead_in(source_info and source_info['duration'], clip_duration)
         
-        if not success:
-            print_warning("Overlay failed, processing without clip number...")
-            process_video_without_overlay(
-                full_video_path, start_time, clip_duration, clip_path, temp_dir
+        if Config().show_clip_numbers:
+            # Try with overlay first, fallback to no overlay if it fails
+            encoder = process_video_with_overlay(
+                full_video_path, section_start, clip_duration, clip_path, temp_dir, clip_num, source_info
             )
+            if not encoder:
+                print_warning("Overlay failed, processing without clip number...")
+        else:
+            encoder = None
         
-        # Cleanup
-        os.remove(full_video_path)
+        if not encoder:
+            encoder = process_video_without_overlay(
+                full_video_path, section_start, clip_duration, clip_path, temp_dir, source_info
+            )
         
         print_success("Video processing complete")
         print_success(f"Clip {clip_num}/{total_clips} saved successfully!")
-        return True
+        return encoder
         
     except subprocess.CalledProcessError as e:
         print_error(f"Failed to process video {video_id}")
         if hasattr(e, 'stderr') and e.stderr:
-            print(f"   Error details: {e.stderr}")
-        return False
+            print_plain(f"   Error details: {e.stderr}")
+        return None
     except Exception as e:
         print_error(f"Unexpected error processing {video_id}: {str(e)}")
-        return False
+        return None
 
 
-def _download_video(video_id, temp_dir, clip_num, total_clips):
-    """Download video from YouTube."""
-    video_url = f"https://www.youtube.com/watch?v={video_id}"
-    temp_video_path = os.path.join(temp_dir, f"{video_id}_full.%(ext)s")
+def download_clip_sources(video_id, clips, clip_duration, temp_dir, total_clips):
+    """
+    Download the sections needed by every clip taken from one video.
     
-    print(f"\n📥 Downloading clip {clip_num}/{total_clips}: {video_id}")
+    All sections come from a single yt-dlp extraction, so the video page and
+    its formats are fetched once however many clips use the video.
     
-    cmd = [
-        'yt-dlp',
-        '-f', 'bestvideo[height<=1080]+bestaudio/bestvideo[height<=720]+bestaudio/best[height<=1080]/best[height<=720]/best',
-        '--merge-output-format', 'mp4',
-        '--concurrent-fragments', '4',
-        '--no-playlist',
-        '-o', temp_video_path,
-        video_url
-    ]
+    Args:
+        video_id (str): YouTube video ID
+        clips (list): (clip_num, start_time) tuples for this video
+        clip_duration (int): Duration of each clip in seconds
+        temp_dir (str): Temporary directory for processing
+        total_clips (int): Total number of clips
+        
+    Returns:
+        dict: Clip number -> downloaded section path, for sections that downloaded
+    """
+    start_times = sorted({start_time for _, start_time in clips})
+    ranges = [(start_time, start_time + clip_duration + SECTION_END_MARGIN) for start_time in start_times]
+    output_template = os.path.join(temp_dir, f"{video_id}_%(section_start)d_full.%(ext)s")
     
-    try:
-        print("   Downloading...")
-        subprocess.run(cmd, capture_output=True, text=True, check=True)
-        print_success("Download complete")
-        return True
-    except subprocess.CalledProcessError:
-        print_error("Download failed")
-        return False
+    if len(clips) == 1:
+        label = f"clip {clips[0][0]}/{total_clips}"
+    else:
+        label = f"clips {', '.join(str(clip_num) for clip_num, _ in clips)} (of {total_clips})"
+    print_plain(f"\n📥 Downloading {label}: {video_id}")
+    
+    print_plain("   Downloading...")
+    for attempt in range(DOWNLOAD_ATTEMPTS):
+        try:
+            paths = download_sections(video_id, ranges, output_template)
+            print_success(f"Download complete ({video_id})")
+            break
+        except Exception as e:
+            if attempt == DOWNLOAD_ATTEMPTS - 1 or any(
+                    error in str(e) for error in UNRECOVERABLE_DOWNLOAD_ERRORS):
+                print_error(f"Download failed ({video_id})")
+                return {}
+            # Exponential backoff with jitter, so throttled workers do not retry in lockstep
+            delay = min(0.5 * 2 ** attempt + random.uniform(0, 0.5), 10)
+            print_warning(f"Download failed ({video_id}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
+    
+    return {clip_num: paths[start_time] for clip_num, start_time in clips if start_time in paths}
 
 
-def _find_downloaded_file(video_id, temp_dir):
-    """Find the downloaded video file."""
-    downloaded_files = list(Path(temp_dir).glob(f"{video_id}_full.*"))
-    if not downloaded_files:
-        print_error(f"Downloaded video file not found for {video_id}")
-        return None
-    return str(downloaded_files[0])
+def section_lead_in(section_duration, clip_duration):
+    """
+    Find how far into a downloaded section the requested timestamp is.
+    
+    Sections are stream copied, so they begin on the keyframe at or before the
+    requested start but still end at the requested end. Whatever the section
+    has beyond the requested length comes before the timestamp. A section cut
+    short by the end of its video is assumed to have no lead-in.
+    
+    Args:
+        section_duration (float): Probed duration of the section, or None if unknown
+        clip_duration (int): Duration of the clip the section was downloaded for
+        
+    Returns:
+        float: Seconds to skip at the start of the section
+    """
+    if not section_duration:
+        return 0
+    return max(0, round(section_duration - clip_duration - SECTION_END_MARGIN, 3))
 
 
-def _show_source_info(full_video_path):
+def _matches_target(info):
+    """Check whether a probed source can be stream copied without normalization."""
+    return bool(info) and (
+        info['codec'] == TARGET_CODEC
+        and info['width'] == TARGET_WIDTH
+        and info['height'] == TARGET_HEIGHT
+        and info['fps'] == TARGET_FPS
+    )
+
+
+def _show_source_info(info):
     """Show source video information."""
-    try:
-        probe_cmd = [
-            'ffprobe', '-v', 'quiet', '-select_streams', 'v:0', 
-            '-show_entries', 'stream=width,height,r_frame_rate', 
-            '-of', 'csv=s=x:p=0', full_video_path
-        ]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
-        source_info = result.stdout.strip()
-        print_info(f"Source quality: {source_info}")
-    except Exception:
-        pass  # Not critical if this fails
+    if info:
+        print_info(f"Source quality: {info['width']}x{info['height']}x{info['fps']} ({info['codec']})")
 
 
 def check_dependencies():
-    """Check if required dependencies (yt-dlp and ffmpeg) are available."""
+    """Check if required dependencies (yt-dlp, ffmpeg and ffprobe) are available."""
     print_info("Checking dependencies...")
     
     dependencies_ok = True
     
-    # Check yt-dlp
-    try:
-        subprocess.run(['yt-dlp', '--version'], capture_output=True, check=True)
+    # Check yt-dlp (used through its Python API)
+    if YoutubeDL is not None:
         print_success("yt-dlp is available")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print_error("yt-dlp is not installed or not in PATH")
+    else:
+        print_error("yt-dlp is not installed")
         print("   Install with: pip install yt-dlp")
         dependencies_ok = False
     
-    # Check ffmpeg
-    try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-        print_success("ffmpeg is available")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print_error("ffmpeg is not installed or not in PATH")
-        print("   Download from: https://ffmpeg.org/download.html")
-        dependencies_ok = False
+    # Check ffmpeg and ffprobe concurrently; each check may spawn a process
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        ffmpeg_check = executor.submit(is_tool_available, 'ffmpeg', ['-version'])
+        ffprobe_check = executor.submit(is_tool_available, 'ffprobe', ['-version'])
+    
+    for name, check in (('ffmpeg', ffmpeg_check), ('ffprobe', ffprobe_check)):
+        if check.result():
+            print_success(f"{name} is available")
+        else:
+            print_error(f"{name} is not installed or not in PATH")
+            print("   Download from: https://ffmpeg.org/download.html")
+            dependencies_ok = False
     
     if dependencies_ok:
         print_success("All dependencies are ready!")
@@ -2,128 +2,314 @@
 Video stitching utilities for combining clips with or without transitions.
 """
 
-import os
+import io
 import subprocess
-from .ui import print_success, print_error, print_info
+from pathlib import Path
+from .ui import print_success, print_error, print_info, print_warning, parse_stream_info
+from .probe_cache import has_audio_stream, get_duration
+from .video_processor import (
+    BASE_VIDEO_FILTER, NVENC_ARGS, section_lead_in, find_font_file, escape_font_path, create_drawtext_filter,
+    run_ffmpeg, nvenc_available, handle_nvenc_failure
+)
 
 
-def create_video_list_file(clip_paths, temp_dir):
-    """Create a text file listing all video clips for ffmpeg concatenation."""
-    list_file_path = os.path.join(temp_dir, "video_list.txt")
+# Software fallback for the final encode when NVENC is not available
+FINAL_X264_ARGS = ['-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '23']
+
+# xfade and acrossfade need matching pixel format, SAR and audio format on both inputs
+XFADE_VIDEO_PREP = "format=yuv420p,setsar=1"
+XFADE_AUDIO_PREP = "aformat=sample_rates=48000:channel_layouts=stereo"
+
+
+def create_video_list(clip_paths):
+    """Build the concat demuxer list of all video clips, ready to pipe to ffmpeg."""
+    # Absolute POSIX-style paths work for ffmpeg on every platform
+    return "".join(
+        f"file '{Path(clip_path).resolve().as_posix()}'\n" for clip_path in clip_paths
+    ).encode('utf-8')
+
+
+def _encode_output(build_cmd, software_args, input=None):
+    """
+    Run a final encode with NVENC when ffmpeg has it, falling back to software_args.
     
-    with open(list_file_path, 'w') as f:
-        for clip_path in clip_paths:
-            # Use forward slashes for ffmpeg, even on Windows
-            normalized_path = clip_path.replace('\\', '/')
-            f.write(f"file '{normalized_path}'\n")
+    Args:
+        build_cmd (callable): Builds the ffmpeg command from the video encoder options
+        software_args (list): Video encoder options for the libx264 fallback
+        input (bytes): Data written to ffmpeg's stdin
+        
+    Returns:
+        subprocess.CompletedProcess: The successful ffmpeg run
+        
+    Raises:
+        subprocess.CalledProcessError: If the software encode fails
+    """
+    if nvenc_available():
+        try:
+            return run_ffmpeg(build_cmd(NVENC_ARGS), input=input)
+        except subprocess.CalledProcessError as e:
+            handle_nvenc_failure(e)
+    return run_ffmpeg(build_cmd(software_args), input=input)
+
+
+def _audio_source(index, clip_path, clip_duration):
+    """
+    Filter graph source for a clip's audio.
     
-    return list_file_path
+    Clips without an audio stream get generated silence so the audio concat
+    still has one segment per clip.
+    """
+    if has_audio_stream(clip_path):
+        return f"[{index}:a]"
+    return f"anullsrc=r=48000:cl=stereo,atrim=0:{clip_duration},"
 
 
-def stitch_videos_with_transitions(clip_paths, output_path, temp_dir, transition_duration=1.0, clip_duration=30):
-    """Concatenate video clips with blend transitions between them."""
+def _write_crossfades(graph, durations, transition_duration):
+    """
+    Chain the prepared [v<i>]/[a<i>] streams into [vout]/[aout] with xfade and acrossfade.
+    
+    Each clip starts transition_duration before the output so far ends. The
+    offsets come from the real clip durations, so a clip cut short by the end
+    of its video does not push later transitions past the end of the stream.
+    
+    Args:
+        graph (io.StringIO): Filter graph being built
+        durations (list): Duration of each clip in seconds
+        transition_duration (float): Duration of each crossfade in seconds
+    """
+    xfade = f"xfade=transition=fade:duration={transition_duration}:offset="
+    acrossfade = f"acrossfade=d={transition_duration}"
+    
+    elapsed = durations[0]
+    last = len(durations) - 1
+    for i in range(1, len(durations)):
+        video_in = "[v0]" if i == 1 else f"[vx{i - 1}]"
+        audio_in = "[a0]" if i == 1 else f"[ax{i - 1}]"
+        video_out = "[vout]" if i == last else f"[vx{i}]"
+        audio_out = "[aout]" if i == last else f"[ax{i}]"
+        offset = round(elapsed - transition_duration, 3)
+        graph.write(f"{video_in}[v{i}]{xfade}{offset}{video_out}; ")
+        graph.write(f"{audio_in}[a{i}]{acrossfade}{audio_out}")
+        if i != last:
+            graph.write("; ")
+        elapsed = offset + durations[i]
+
+
+def stitch_videos_with_transitions(clip_paths, output_path, temp_dir, transition_duration=1.0, clip_duration=30,
+                                   clip_encoders=None):
+    """
+    Concatenate video clips with blend transitions between them.
+    
+    clip_encoders is passed on to stitch_videos_simple if the transitions fail.
+    
+    Returns:
+        str: Output stream info ("" if unknown), or None on failure
+    """
     if not clip_paths:
         print_error("No clips to concatenate")
-        return False
+        return None
     
     if len(clip_paths) == 1:
         # Single clip, no transitions needed - just copy
         print("\n🔗 Single clip detected, copying to output...")
         try:
-            subprocess.run(['ffmpeg', '-i', clip_paths[0], '-c', 'copy', output_path, '-y'], 
-                         capture_output=True, check=True)
+            result = run_ffmpeg(['ffmpeg', '-i', clip_paths[0], '-c', 'copy',
+                                 '-movflags', '+faststart', output_path, '-y'])
             print_success(f"Single clip copied: {output_path}")
-            return True
+            return parse_stream_info(result.stderr) or ""
         except subprocess.CalledProcessError as e:
             print_error(f"Failed to copy single clip: {str(e)}")
-            return False
+            return None
     
     print(f"\n🔗 Combining {len(clip_paths)} clips with {transition_duration}s blend transitions...")
     
-    # For transitions, we'll use a different approach with overlay filters
+    # Crossfade each clip into the next with xfade/acrossfade
     inputs = []
-    filter_complex = []
+    durations = []
+    graph = io.StringIO()
     
-    # Add all input files
     for i, clip_path in enumerate(clip_paths):
         inputs.extend(['-i', clip_path])
+        duration = get_duration(clip_path) or clip_duration
+        durations.append(duration)
+        graph.write(f"[{i}:v]fps=30,{XFADE_VIDEO_PREP}[v{i}]; ")
+        graph.write(f"{_audio_source(i, clip_path, duration)}{XFADE_AUDIO_PREP}[a{i}]; ")
     
-    # Create fade in/out effects and overlay them
-    video_filters = []
-    audio_filters = []
-    
-    for i, clip_path in enumerate(clip_paths):
-        if i == 0:
-            # First clip: fade out at the end
-            video_filters.append(f"[{i}:v]fade=t=out:st={clip_duration-transition_duration}:d={transition_duration}[v{i}]")
-            audio_filters.append(f"[{i}:a]afade=t=out:st={clip_duration-transition_duration}:d={transition_duration}[a{i}]")
-        elif i == len(clip_paths) - 1:
-            # Last clip: fade in at the beginning  
-            video_filters.append(f"[{i}:v]fade=t=in:st=0:d={transition_duration}[v{i}]")
-            audio_filters.append(f"[{i}:a]afade=t=in:st=0:d={transition_duration}[a{i}]")
-        else:
-            # Middle clips: fade in and out
-            video_filters.append(f"[{i}:v]fade=t=in:st=0:d={transition_duration},fade=t=out:st={clip_duration-transition_duration}:d={transition_duration}[v{i}]")
-            audio_filters.append(f"[{i}:a]afade=t=in:st=0:d={transition_duration},afade=t=out:st={clip_duration-transition_duration}:d={transition_duration}[a{i}]")
-    
-    # Concatenate the faded clips
-    video_concat = "".join(f"[v{i}]" for i in range(len(clip_paths))) + f"concat=n={len(clip_paths)}:v=1:a=0[vout]"
-    audio_concat = "".join(f"[a{i}]" for i in range(len(clip_paths))) + f"concat=n={len(clip_paths)}:v=0:a=1[aout]"
+    _write_crossfades(graph, durations, transition_duration)
     
-    filter_complex = video_filters + audio_filters + [video_concat, audio_concat]
+    filter_complex = graph.getvalue()
     
-    # Build ffmpeg command
-    cmd = ['ffmpeg'] + inputs + [
-        '-filter_complex', '; '.join(filter_complex),
-        '-map', '[vout]', '-map', '[aout]',
-        '-c:v', 'libx264', '-preset', 'medium', '-crf', '23',
-        '-c:a', 'aac', '-b:a', '128k',
-        output_path, '-y'
-    ]
+    def build_cmd(encoder_args):
+        return ['ffmpeg'] + inputs + [
+            '-filter_complex', filter_complex,
+            '-map', '[vout]', '-map', '[aout]',
+            *encoder_args,
+            '-c:a', 'aac', '-b:a', '128k',
+            '-movflags', '+faststart',
+            output_path, '-y'
+        ]
     
     try:
         print("   Creating transitions...")
-        subprocess.run(cmd, capture_output=True, check=True)
+        # The crossfades are filtered on the CPU; only the encode moves to the GPU
+        result = _encode_output(build_cmd, ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23'])
         print_success(f"Final video with transitions created: {output_path}")
-        return True
+        return parse_stream_info(result.stderr) or ""
         
     except subprocess.CalledProcessError as e:
         print_error(f"Failed to create video with transitions: {str(e)}")
         print_info("Falling back to simple concatenation...")
-        return stitch_videos_simple(clip_paths, output_path, temp_dir)
+        return stitch_videos_simple(clip_paths, output_path, temp_dir, clip_encoders)
 
 
-def stitch_videos_simple(clip_paths, output_path, temp_dir):
-    """Concatenate all video clips into a single video without transitions (faster)."""
+def stitch_videos_simple(clip_paths, output_path, temp_dir, clip_encoders=None):
+    """
+    Concatenate all video clips into a single video without transitions (faster).
+    
+    Clips are joined with stream copy when they all came out of the same
+    encoder. The output track carries only the first clip's codec
+    parameters, so clips that were stream copied, encoded with libx264 and
+    encoded with NVENC cannot be copied into one file and are re-encoded.
+    
+    Args:
+        clip_paths (list): Clip paths in output order
+        output_path (str): Path of the final video
+        temp_dir (str): Temporary directory for processing
+        clip_encoders (list): Encoder of each clip as reported by extract_clips
+            (None for clips of unknown origin), or None to always stream copy
+    
+    Returns:
+        str: Output stream info ("" if unknown), or None on failure
+    """
     if not clip_paths:
         print_error("No clips to concatenate")
-        return False
+        return None
     
     print(f"\n🔗 Combining {len(clip_paths)} clips into final video...")
     
-    # Create video list file
-    list_file_path = create_video_list_file(clip_paths, temp_dir)
-    
-    # Use ffmpeg to concatenate with stream copy for speed
-    cmd = [
-        'ffmpeg', '-f', 'concat', '-safe', '0', '-i', list_file_path,
-        '-c', 'copy', '-avoid_negative_ts', 'make_zero', output_path, '-y'
-    ]
+    # The clip list is fed through stdin, timestamps are regenerated on input
+    # and the moov atom is written up front in this pass
+    def build_cmd(codec_args):
+        return [
+            'ffmpeg', '-fflags', '+genpts', '-f', 'concat', '-safe', '0',
+            '-protocol_whitelist', 'file,pipe', '-i', 'pipe:0',
+            *codec_args, '-avoid_negative_ts', 'make_zero', '-movflags', '+faststart',
+            output_path, '-y'
+        ]
     
     try:
         print("   Combining clips...")
-        subprocess.run(cmd, capture_output=True, check=True)
+        video_list = create_video_list(clip_paths)
+        if clip_encoders and len(set(clip_encoders)) > 1:
+            print_info("Clips come from different encoders, re-encoding while combining...")
+            result = _encode_output(
+                lambda encoder_args: build_cmd([*encoder_args, '-c:a', 'aac', '-b:a', '128k']),
+                FINAL_X264_ARGS, input=video_list
+            )
+        else:
+            result = run_ffmpeg(build_cmd(['-c', 'copy']), input=video_list)
         print_success(f"Final video created: {output_path}")
-        return True
+        return parse_stream_info(result.stderr) or ""
         
     except subprocess.CalledProcessError as e:
         print_error(f"Failed to create final video: {str(e)}")
-        return False
+        return None
+
+
+def stitch_in_one_pass(sources, output_path, temp_dir, clip_duration=30, use_transitions=False,
+                       transition_duration=1.0, show_clip_numbers=True):
+    """
+    Cut, normalize and concatenate downloaded sources in a single ffmpeg run.
+    
+    Intermediate clips are never written to disk and the output is encoded once.
+    
+    Args:
+        sources (list): (source_path, clip_num) tuples in output order
+        output_path (str): Path of the final video
+        temp_dir (str): Temporary directory for processing
+        clip_duration (int): Duration of each clip in seconds
+        use_transitions (bool): Crossfade between clips
+        transition_duration (float): Duration of each crossfade in seconds
+        show_clip_numbers (bool): Draw the clip number on each clip
+        
+    Returns:
+        str: Output stream info ("" if unknown), or None on failure
+    """
+    if not sources:
+        print_error("No clips to concatenate")
+        return None
+    
+    print(f"\n🔗 Cutting and combining {len(sources)} clips in a single pass...")
+    
+    font_file = None
+    if show_clip_numbers:
+        font_path = find_font_file()
+        if font_path:
+            font_file = escape_font_path(font_path)
+        else:
+            print_warning("Overlay font not available, clips will not be numbered")
+    
+    # Crossfade like the multi-pass transitions, rather than fading through black
+    crossfading = use_transitions and len(sources) > 1
+    # BASE_VIDEO_FILTER already sets the SAR, so only the pixel format is added
+    video_prep = ",format=yuv420p" if crossfading else ""
+    audio_prep = f",{XFADE_AUDIO_PREP}" if crossfading else ""
+    
+    inputs = []
+    durations = []
+    graph = io.StringIO()
+    concat_inputs = io.StringIO()
+    
+    for i, (source_path, clip_num) in enumerate(sources):
+        # Skip the lead-in before the timestamp, and limit the input's duration
+        # so demuxing stops at the end of the clip instead of decoding the rest
+        # of the section only to trim it away
+        section_duration = get_duration(source_path)
+        lead_in = section_lead_in(section_duration, clip_duration)
+        inputs.extend(['-ss', str(lead_in), '-t', str(clip_duration), '-i', source_path])
+        # A section near the end of its video can be shorter than a clip
+        duration = min((section_duration or clip_duration) - lead_in, clip_duration)
+        durations.append(duration)
+        
+        graph.write(f"[{i}:v]setpts=PTS-STARTPTS,{BASE_VIDEO_FILTER}")
+        if font_file:
+            graph.write("," + create_drawtext_filter(font_file, clip_num))
+        graph.write(f"{video_prep}[v{i}]; ")
+        graph.write(f"{_audio_source(i, source_path, duration)}asetpts=PTS-STARTPTS{audio_prep}[a{i}]; ")
+        concat_inputs.write(f"[v{i}][a{i}]")
+    
+    if crossfading:
+        _write_crossfades(graph, durations, transition_duration)
+    else:
+        graph.write(f"{concat_inputs.getvalue()}concat=n={len(sources)}:v=1:a=1[vout][aout]")
+    filter_complex = graph.getvalue()
+    
+    def build_cmd(encoder_args):
+        return ['ffmpeg'] + inputs + [
+            '-filter_complex', filter_complex,
+            '-map', '[vout]', '-map', '[aout]',
+            *encoder_args,
+            '-c:a', 'aac', '-b:a', '128k', '-movflags', '+faststart',
+            '-threads', '0', output_path, '-y'
+        ]
+    
+    try:
+        print("   Processing clips...")
+        # Filtering stays on the CPU (drawtext, concat); only the encode moves to the GPU
+        result = _encode_output(build_cmd, FINAL_X264_ARGS)
+        print_success(f"Final video created: {output_path}")
+        return parse_stream_info(result.stderr) or ""
+        
+    except subprocess.CalledProcessError as e:
+        print_error(f"Failed to create video in a single pass: {str(e)}")
+        return None
 
 
-def stitch_videos(clip_paths, output_path, temp_dir, use_transitions=False, transition_duration=1.0, clip_duration=30):
-    """Concatenate video clips with optional blend transitions."""
+def stitch_videos(clip_paths, output_path, temp_dir, use_transitions=False, transition_duration=1.0, clip_duration=30,
+                  clip_encoders=None):
+    """Concatenate video clips with optional blend transitions (returns stream info, or None on failure)."""
     if use_transitions:
-        return stitch_videos_with_transitions(clip_paths, output_path, temp_dir, transition_duration, clip_duration)
+        return stitch_videos_with_transitions(clip_paths, output_path, temp_dir, transition_duration, clip_duration,
+                                              clip_encoders)
     else:
-        return stitch_videos_simple(clip_paths, output_path, temp_dir)
+        return stitch_videos_simple(clip_paths, output_path, temp_dir, clip_encoders)
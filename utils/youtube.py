@@ -1,11 +1,46 @@
 """
-YouTube URL parsing utilities.
-Handles extraction of video IDs and timestamps from various YouTube URL formats.
+YouTube URL parsing and download utilities.
+Handles extraction of video IDs and timestamps from various YouTube URL formats,
+and downloads video sections through the yt-dlp Python API.
 """
 
 import re
-from urllib.parse import urlparse, parse_qs
+import functools
+import threading
 
+try:
+    from yt_dlp import YoutubeDL
+    from yt_dlp.utils import download_range_func
+except ImportError:  # Reported by check_dependencies
+    YoutubeDL = None
+
+# Video ID from watch, short, embed and /v/ links
+_URL_RE = re.compile(
+    r'(?:youtube\.com/(?:watch\?(?:[^&#]*&)*v=|embed/|v/)|youtu\.be/)'
+    r'(?P<id>[a-zA-Z0-9_-]{11})'
+)
+# t= parameter anywhere in the query, in seconds ("90", "90s") or YouTube's
+# unit form ("1h2m3s")
+_T_PATTERN = re.compile(r'[?&]t=(\d+(?:[hms]\d*)*)')
+_TIME_PART_RE = re.compile(r'(\d+)([hms]?)')
+_TIME_UNITS = {'h': 3600, 'm': 60, 's': 1, '': 1}
+
+# A progressive 1080p mp4 needs no merge at all, and H.264 + AAC streams merge
+# into mp4 with a plain remux and can later be cut with stream copy. Other
+# codecs are only used when those are not offered. Sections themselves are
+# stream copied, so they start on the keyframe at or before the requested time.
+DOWNLOAD_FORMAT = (
+    "best[ext=mp4][height=1080]/"
+    "bestvideo[height<=1080][vcodec^=avc1]+bestaudio[ext=m4a]/"
+    "bestvideo[height<=1080]+bestaudio/bestvideo[height<=720]+bestaudio/"
+    "best[height<=1080]/best[height<=720]/best"
+)
+
+# One YoutubeDL per worker thread, reused across clips so extractor state
+# and cached player data stay warm instead of being rebuilt per download
+_downloaders = threading.local()
+
+@functools.lru_cache(maxsize=None)
 def parse_youtube_url(url):
     """
     Parse YouTube URL to extract video ID and timestamp.
@@ -20,31 +55,61 @@ def parse_youtube_url(url):
     Raises:
         ValueError: If video ID cannot be extracted from URL
     """
-    # Regular expressions for different YouTube URL formats
-    patterns = [
-        r'(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]+)',
-        r'youtube\.com/embed/([a-zA-Z0-9_-]+)',
-        r'youtube\.com/v/([a-zA-Z0-9_-]+)'
-    ]
-    
-    video_id = None
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            video_id = match.group(1)
-            break
-    
-    if not video_id:
+    match = _URL_RE.search(url)
+    if not match:
         raise ValueError(f"Could not extract video ID from URL: {url}")
     
-    # Extract timestamp
-    timestamp = 0
-    if 't=' in url:
-        # Parse t parameter
-        parsed_url = urlparse(url)
-        if parsed_url.query:
-            params = parse_qs(parsed_url.query)
-            if 't' in params:
-                timestamp = int(params['t'][0])
+    video_id = match['id']
+    t_match = _T_PATTERN.search(url)
+    timestamp = sum(int(value) * _TIME_UNITS[unit]
+                    for value, unit in _TIME_PART_RE.findall(t_match[1] if t_match else ''))
     
     return video_id, timestamp
+
+
+def _get_downloader():
+    """Return this thread's YoutubeDL instance, creating it on first use."""
+    ydl = getattr(_downloaders, 'ydl', None)
+    if ydl is None:
+        ydl = YoutubeDL({
+            'format': DOWNLOAD_FORMAT,
+            'merge_output_format': 'mp4',
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+        })
+        _downloaders.ydl = ydl
+    return ydl
+
+
+def download_sections(video_id, ranges, output_template):
+    """
+    Download several sections of one YouTube video with a single extraction.
+    
+    Args:
+        video_id (str): YouTube video ID
+        ranges (list): (start_time, end_time) tuples in seconds
+        output_template (str): yt-dlp output template; must include
+            %(section_start)s when more than one range is requested
+        
+    Returns:
+        dict: Section start time -> final path of the downloaded file
+        
+    Raises:
+        yt_dlp.utils.DownloadError: If the download fails
+    """
+    ydl = _get_downloader()
+    
+    # Per-download options; safe to change because each thread owns its instance
+    ydl.params['outtmpl']['default'] = output_template
+    ydl.params['download_ranges'] = download_range_func(None, ranges)
+    
+    info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=True)
+    
+    # yt-dlp records one download per section, tagged with its start time
+    downloaded = {
+        float(download['section_start']): download['filepath']
+        for download in info['requested_downloads']
+    }
+    return {start_time: downloaded[float(start_time)] for start_time, _ in ranges
+            if float(start_time) in downloaded}